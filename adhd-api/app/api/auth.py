@@ -29,14 +29,21 @@ router = APIRouter(prefix="/auth", tags=["认证"])
 security = HTTPBearer()
 
 
+async def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
+    """
+    获取认证服务的依赖注入函数
+    FastAPI 在同一请求内缓存依赖结果，路由与 get_current_user_from_token 共享同一实例
+    """
+    return AuthService(db)
+
+
 async def get_current_user_from_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     从 Token 中获取当前用户的依赖注入函数
     """
-    auth_service = AuthService(db)
     try:
         user = await auth_service.get_current_user(credentials.credentials)
         return user
@@ -51,7 +58,7 @@ async def get_current_user_from_token(
 @router.post("/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     data: UserRegisterRequest,
-    db: AsyncSession = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     用户注册
@@ -60,8 +67,6 @@ async def register(
     - **password**: 密码，至少8位，包含字母和数字（必填）
     - **username**: 用户名（可选）
     """
-    auth_service = AuthService(db)
-    
     try:
         await auth_service.register(data)
         return MessageResponse(message="注册成功")
@@ -75,7 +80,7 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     data: UserLoginRequest,
-    db: AsyncSession = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     用户登录
@@ -85,8 +90,6 @@ async def login(
     
     返回 access_token 和 refresh_token
     """
-    auth_service = AuthService(db)
-    
     try:
         tokens = await auth_service.login(data.email, data.password)
         return tokens
@@ -100,15 +103,13 @@ async def login(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     data: RefreshTokenRequest,
-    db: AsyncSession = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     刷新访问令牌
     
     使用 refresh_token 获取新的 access_token 和 refresh_token
     """
-    auth_service = AuthService(db)
-    
     try:
         tokens = await auth_service.refresh_tokens(data.refresh_token)
         return tokens
@@ -135,15 +136,15 @@ async def get_current_user(
 async def update_current_user(
     data: UserUpdateRequest,
     current_user = Depends(get_current_user_from_token),
-    db: AsyncSession = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     更新当前用户信息
     
     - **username**: 新的用户名
     """
-    from app.repository.user_repository import UserRepository
-    
-    user_repo = UserRepository(db)
-    updated_user = await user_repo.update(current_user, username=data.username)
+    updated_user = await auth_service.user_repo.update(
+        current_user,
+        **data.model_dump(exclude_unset=True, exclude_none=True)
+    )
     return updated_user
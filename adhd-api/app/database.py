@@ -2,6 +2,9 @@
 数据库连接模块
 提供异步数据库会话管理
 """
+import asyncio
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -14,6 +17,14 @@ engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,  # 调试模式下打印 SQL
     pool_pre_ping=True,   # 连接前检查连接是否有效
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,  # 定期回收连接，避免被服务端超时断开
+    connect_args={
+        "statement_cache_size": 1024,          # asyncpg 连接级语句缓存
+        "prepared_statement_cache_size": 512,  # SQLAlchemy 适配层预编译语句缓存
+        "server_settings": {"jit": "off"},     # 关闭 JIT，短查询无需 JIT 编译
+    },
 )
 
 # 创建异步会话工厂
@@ -21,6 +32,7 @@ AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
+    autoflush=False,  # 查询前不自动 flush，写操作均显式提交
 )
 
 
@@ -32,13 +44,10 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:
     """
     获取数据库会话的依赖注入函数
-    用于 FastAPI 的 Depends
+    用于 FastAPI 的 Depends，会话在请求结束时由上下文管理器关闭
     """
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 async def init_db():
@@ -48,3 +57,15 @@ async def init_db():
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def warm_up_db_pool():
+    """
+    预热数据库连接池
+    启动时并发建立 pool_size 个连接，避免首批请求承担建连开销
+    """
+    async def _connect():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(_connect() for _ in range(settings.db_pool_size)))
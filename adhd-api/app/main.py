@@ -5,9 +5,11 @@ FastAPI 应用入口
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from app.config import get_settings
-from app.database import init_db
+from app.database import init_db, warm_up_db_pool
+from app.service.auth_service import init_hash_pool, shutdown_hash_pool
 from app.api.auth import router as auth_router
 
 settings = get_settings()
@@ -17,15 +19,23 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     """
     应用生命周期管理
-    启动时初始化数据库，关闭时清理资源
+    启动时初始化资源，关闭时清理资源
+    生产环境的表结构由 Alembic 迁移管理（alembic upgrade head），
+    仅在调试模式下自动建表
     """
     # 启动时执行
-    await init_db()
-    print("数据库初始化完成")
+    if settings.debug:
+        await init_db()
+        print("数据库初始化完成")
+    
+    await warm_up_db_pool()
+    
+    init_hash_pool(settings.hash_pool_workers)
     
     yield
     
     # 关闭时执行
+    shutdown_hash_pool()
     print("应用关闭")
 
 
@@ -35,6 +45,7 @@ app = FastAPI(
     description="ADHD 助手应用后端 API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # 使用 orjson 序列化响应，原生支持 UUID 和 datetime
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -52,13 +63,13 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api")
 
 
-@app.get("/")
+@app.get("/", response_class=PlainTextResponse)
 async def root():
-    """根路径健康检查"""
-    return {"status": "ok", "message": "ADHD Assistant API is running"}
+    """根路径健康检查，返回纯文本，不经过 JSON 序列化"""
+    return "ADHD Assistant API is running"
 
 
-@app.get("/health")
+@app.get("/health", response_class=PlainTextResponse)
 async def health_check():
-    """健康检查端点"""
-    return {"status": "healthy"}
+    """健康检查端点，供负载均衡探活，返回纯文本"""
+    return "healthy"
@@ -0,0 +1,28 @@
+"""users email covering index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "users_email_covering_idx",
+        "users",
+        ["email"],
+        unique=True,
+        postgresql_include=["id", "password_hash", "is_active"],
+    )
+    op.drop_index("ix_users_email", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.drop_index("users_email_covering_idx", table_name="users")
@@ -2,33 +2,55 @@
 用户数据模型
 定义用户表的 ORM 映射
 """
+import os
+import time
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func
+from sqlalchemy import String, Boolean, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.database import Base
 
 
+def uuid_v7() -> uuid.UUID:
+    """
+    生成 UUIDv7（RFC 9562）
+    高 48 位为毫秒时间戳，按时间递增，新记录写入主键索引的末端
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # 版本号 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 变体
+    return uuid.UUID(int=value)
+
+
 class User(Base):
     """用户模型"""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # 邮箱唯一索引，INCLUDE 登录所需字段，使登录查询只需扫描索引
+        Index(
+            "users_email_covering_idx",
+            "email",
+            unique=True,
+            postgresql_include=["id", "password_hash", "is_active"],
+        ),
+    )
     
-    # 主键使用 UUID，增强安全性
+    # 主键使用 UUID，增强安全性；UUIDv7 按时间有序，提升索引插入局部性
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid_v7
     )
     
-    # 邮箱作为登录标识，必须唯一
+    # 邮箱作为登录标识，必须唯一（由 users_email_covering_idx 保证）
     email: Mapped[str] = mapped_column(
         String(255),
-        unique=True,
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # 密码哈希，不存储明文密码
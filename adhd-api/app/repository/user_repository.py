@@ -2,12 +2,41 @@
 用户仓储层
 负责数据库 CRUD 操作
 """
+import itertools
+import threading
 import uuid
-from sqlalchemy import select
+from cachetools import LRUCache, TTLCache
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.model.user import User
 
+# 按 ID 缓存的用户对象（与会话无关的独立副本），更新时失效
+_user_cache: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_user_cache_lock = threading.Lock()
+
+# 每个用户 ID 最近一次失效时的代号。查询前记录代号，查询返回后代号未变才写入缓存，
+# 避免查询期间发生的更新被旧数据覆盖。代号取自全局递增计数器，永不重复，
+# 条目被 LRU 淘汰后读到的默认值 0 也不会与任何已记录的代号相同
+_user_cache_generations: LRUCache = LRUCache(maxsize=16384)
+_user_cache_generation_counter = itertools.count(1)
+
+
+def _detached_copy(user: User) -> User:
+    """复制用户的列属性，得到不绑定任何会话的新对象"""
+    return User(**{
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+    })
+
+
+def _invalidate_user_cache(user_id: uuid.UUID) -> None:
+    """使指定用户的缓存失效，并更新其代号使进行中的查询结果不再写入缓存"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+        _user_cache_generations[user_id] = next(_user_cache_generation_counter)
+
 
 class UserRepository:
     """用户数据访问对象"""
@@ -15,9 +44,15 @@ class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def create(self, email: str, password_hash: str, username: str | None = None) -> User:
+    async def create_if_absent(
+        self,
+        email: str,
+        password_hash: str,
+        username: str | None = None
+    ) -> User | None:
         """
-        创建新用户
+        邮箱未被注册时创建新用户
+        使用 INSERT ... ON CONFLICT DO NOTHING，由数据库原子地保证邮箱唯一
         
         Args:
             email: 邮箱地址
@@ -25,32 +60,34 @@ class UserRepository:
             username: 用户名（可选）
         
         Returns:
-            创建的用户对象
+            创建的用户对象，邮箱已存在则返回 None
         """
-        user = User(
-            email=email,
-            password_hash=password_hash,
-            username=username
+        stmt = (
+            insert(User)
+            .values(email=email, password_hash=password_hash, username=username)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        self.db.add(user)
+        result = await self.db.execute(stmt)
+        user = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(user)
         return user
     
-    async def get_by_email(self, email: str) -> User | None:
+    async def get_auth_row(self, email: str) -> tuple[uuid.UUID, str, bool] | None:
         """
-        根据邮箱查询用户
+        根据邮箱查询登录校验所需的字段
+        只投影 (id, password_hash, is_active)，不加载完整用户对象
         
         Args:
             email: 邮箱地址
         
         Returns:
-            用户对象，不存在则返回 None
+            (用户 ID, 密码哈希, 是否激活)，不存在则返回 None
         """
         result = await self.db.execute(
-            select(User).where(User.email == email)
+            select(User.id, User.password_hash, User.is_active).where(User.email == email)
         )
-        return result.scalar_one_or_none()
+        return result.first()
     
     async def get_by_id(self, user_id: uuid.UUID) -> User | None:
         """
@@ -62,39 +99,80 @@ class UserRepository:
         Returns:
             用户对象，不存在则返回 None
         """
+        with _user_cache_lock:
+            cached = _user_cache.get(user_id)
+            generation = _user_cache_generations.get(user_id, 0)
+        if cached is not None:
+            return _detached_copy(cached)
+        
         result = await self.db.execute(
             select(User).where(User.id == user_id)
         )
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        if user is not None:
+            with _user_cache_lock:
+                if _user_cache_generations.get(user_id, 0) == generation:
+                    _user_cache[user_id] = _detached_copy(user)
+        return user
     
-    async def update(self, user: User, **kwargs) -> User:
+    async def get_status_row(self, user_id: uuid.UUID) -> tuple[uuid.UUID, bool] | None:
         """
-        更新用户信息
+        根据 ID 查询用户状态
+        只投影 (id, is_active)，用于无需返回用户资料的 Token 校验路径
         
         Args:
-            user: 用户对象
-            **kwargs: 要更新的字段
+            user_id: 用户 ID
         
         Returns:
-            更新后的用户对象
+            (用户 ID, 是否激活)，不存在则返回 None
+        """
+        result = await self.db.execute(
+            select(User.id, User.is_active).where(User.id == user_id)
+        )
+        return result.first()
+    
+    async def update_password_hash(self, user_id: uuid.UUID, password_hash: str) -> None:
         """
-        for key, value in kwargs.items():
-            if hasattr(user, key) and value is not None:
-                setattr(user, key, value)
+        更新用户密码哈希
         
+        Args:
+            user_id: 用户 ID
+            password_hash: 新的密码哈希
+        """
+        await self.db.execute(
+            update(User).where(User.id == user_id).values(password_hash=password_hash)
+        )
         await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        _invalidate_user_cache(user_id)
     
-    async def email_exists(self, email: str) -> bool:
+    async def update(self, user: User, **kwargs) -> User:
         """
-        检查邮箱是否已被注册
+        更新用户信息
         
         Args:
-            email: 邮箱地址
+            user: 用户对象
+            **kwargs: 要更新的字段，值为 None 或与当前值相同的字段会被忽略
         
         Returns:
-            True 表示已存在，False 表示不存在
+            更新后的用户对象
         """
-        user = await self.get_by_email(email)
-        return user is not None
+        # 只保留确实发生变化的字段，无变化时直接返回，不访问数据库
+        values = {
+            key: value for key, value in kwargs.items()
+            if hasattr(User, key) and value is not None and getattr(user, key) != value
+        }
+        if not values:
+            return user
+        
+        # 通过 RETURNING 取回更新后的整行（含 updated_at），无需再 refresh 查询
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        updated_user = result.scalar_one()
+        await self.db.commit()
+        _invalidate_user_cache(user.id)
+        return updated_user
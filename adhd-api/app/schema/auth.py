@@ -2,10 +2,37 @@
 认证相关的 Pydantic 模型
 用于请求验证和响应序列化
 """
+import operator
+import re
 import uuid
 from datetime import datetime
+from functools import reduce
 from pydantic import BaseModel, EmailStr, Field, field_validator
-import re
+
+# 登录邮箱格式的轻量校验，只作为查询键使用，无需完整的邮箱合法性校验
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# 密码字符类别正则（模块加载时编译一次）
+_RE_UPPER = re.compile(r"[A-Z]")
+_RE_LOWER = re.compile(r"[a-z]")
+_RE_DIGIT = re.compile(r"\d")
+_RE_SPECIAL = re.compile(r"[!@#$%^&*(),.?\":{}|<>_\-+=\[\]\\;'/`~]")
+
+# 字符类别位标记，按校验顺序排列，用于给出第一个缺失类别的提示
+_PASSWORD_CLASS_RULES = (
+    (1, _RE_UPPER, "密码必须包含至少一个大写字母"),
+    (2, _RE_LOWER, "密码必须包含至少一个小写字母"),
+    (4, _RE_DIGIT, "密码必须包含至少一个数字"),
+    (8, _RE_SPECIAL, "密码必须包含至少一个特殊字符"),
+)
+
+# 字节 -> 类别位 查找表，使一次 bytes.translate 得到所有字符的类别
+# 非 ASCII 字节（UTF-8 多字节序列）映射为 0
+_PASSWORD_CLASS_TABLE = bytes(
+    sum(bit for bit, pattern, _ in _PASSWORD_CLASS_RULES if pattern.match(chr(i)))
+    if i < 128 else 0
+    for i in range(256)
+)
 
 
 class UserRegisterRequest(BaseModel):
@@ -24,22 +51,38 @@ class UserRegisterRequest(BaseModel):
         """
         if len(v) < 8:
             raise ValueError("密码至少需要8位")
-        if not re.search(r"[A-Z]", v):
-            raise ValueError("密码必须包含至少一个大写字母")
-        if not re.search(r"[a-z]", v):
-            raise ValueError("密码必须包含至少一个小写字母")
-        if not re.search(r"\d", v):
-            raise ValueError("密码必须包含至少一个数字")
-        if not re.search(r"[!@#$%^&*(),.?\":{}|<>_\-+=\[\]\\;'/`~]", v):
-            raise ValueError("密码必须包含至少一个特殊字符")
+        classes = set(v.encode("utf-8").translate(_PASSWORD_CLASS_TABLE))
+        mask = reduce(operator.or_, classes, 0)
+        for bit, _, message in _PASSWORD_CLASS_RULES:
+            if not mask & bit:
+                raise ValueError(message)
         return v
 
 
 class UserLoginRequest(BaseModel):
     """用户登录请求模型"""
     
-    email: EmailStr = Field(..., description="邮箱地址")
+    email: str = Field(..., pattern=_EMAIL_RE.pattern, max_length=254, description="邮箱地址")
     password: str = Field(..., description="密码")
+    
+    @field_validator("email", mode="before")
+    @classmethod
+    def strip_email(cls, v):
+        """
+        去除首尾空白
+        与注册时 EmailStr 的行为保持一致，需在格式校验之前执行
+        """
+        return v.strip() if isinstance(v, str) else v
+    
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        """
+        域名部分转为小写
+        与注册时 EmailStr 的规范化结果保持一致，保证能查到对应用户
+        """
+        local, _, domain = v.rpartition("@")
+        return f"{local}@{domain.lower()}"
 
 
 class TokenResponse(BaseModel):
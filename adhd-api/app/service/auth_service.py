@@ -2,10 +2,26 @@
 认证服务层
 处理用户认证相关的业务逻辑
 """
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import re
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+from typing import Any, Callable, TypeVar
+import anyio
+import bcrypt
+import orjson
+from cachetools import LRUCache, TTLCache
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import jwt
+from jwt import InvalidTokenError as JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -15,8 +31,183 @@ from app.schema.auth import UserRegisterRequest, TokenResponse
 
 settings = get_settings()
 
-# 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# JWT 签名密钥，启动时编码一次，避免每次签发/校验重复编码
+SECRET = settings.secret_key.encode("utf-8")
+
+# 密码哈希器（Argon2id，参数参考 OWASP 推荐：m=19 MiB, t=2, p=1）
+password_hasher = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,
+    parallelism=1,
+    hash_len=32,
+    salt_len=16,
+)
+
+# 旧版 bcrypt 哈希前缀，登录成功后惰性迁移为 Argon2id
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+# 完整的 bcrypt 哈希格式；格式不正确的哈希会使 bcrypt.checkpw 抛出 BaseException 级别的异常
+_BCRYPT_HASH_RE = re.compile(r"\$2[aby]\$\d\d\$[./A-Za-z0-9]{53}")
+
+# 邮箱不存在时用于校验的占位哈希，使两条登录路径耗时一致，避免通过响应时间枚举邮箱
+_DUMMY_HASH = password_hasher.hash("not-a-real-password")
+
+# 密码哈希进程池，由应用生命周期创建和关闭
+_hash_pool: ProcessPoolExecutor | None = None
+_hash_semaphore: asyncio.Semaphore | None = None
+
+# 已验证 Token 缓存：键为 Token 摘要（不保留原始 Token），值为 (载荷, 过期时间戳)
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+_token_cache_lock = threading.Lock()
+# 剩余有效期不足该秒数的 Token 不写入缓存
+_TOKEN_CACHE_MIN_REMAINING = 5
+
+# HS256 签名的固定部分：Header 段，以及按 (用户 ID, Token 类型) 缓存的
+# "Header.Payload 前缀" 和已输入该前缀的 HMAC 状态，签发时只需补上 exp
+_HS256_HEADER_B64 = base64.urlsafe_b64encode(
+    orjson.dumps({"alg": "HS256", "typ": "JWT"})
+).rstrip(b"=")
+_token_signing_cache: LRUCache = LRUCache(maxsize=4096)
+_token_signing_cache_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def _hash_password(password: str) -> str:
+    """计算密码哈希（模块级函数，便于在子进程中执行）"""
+    return password_hasher.hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """校验密码哈希（模块级函数，便于在子进程中执行）"""
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        if not _BCRYPT_HASH_RE.fullmatch(hashed_password):
+            return False
+        try:
+            return bcrypt.checkpw(
+                plain_password.encode("utf-8"),
+                hashed_password.encode("utf-8")
+            )
+        except ValueError:
+            return False
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def init_hash_pool(max_workers: int) -> None:
+    """
+    创建密码哈希进程池
+    使用 spawn 方式启动子进程，避免子进程继承事件循环和已打开的数据库连接
+    
+    Args:
+        max_workers: 进程数
+    """
+    global _hash_pool, _hash_semaphore
+    _hash_pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    # 并发数与进程数一致，防止注册高峰时任务在队列中堆积
+    _hash_semaphore = asyncio.Semaphore(max_workers)
+
+
+def shutdown_hash_pool() -> None:
+    """关闭密码哈希进程池"""
+    global _hash_pool, _hash_semaphore
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True)
+    _hash_pool = None
+    _hash_semaphore = None
+
+
+async def run_hash_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    在进程池中执行 CPU 密集的哈希计算
+    进程池未初始化时（如脚本中直接调用）退回到线程池
+    
+    Args:
+        func: 模块级可序列化函数
+        *args: 函数参数
+    
+    Returns:
+        函数返回值
+    """
+    if _hash_pool is None or _hash_semaphore is None:
+        return await anyio.to_thread.run_sync(func, *args)
+    
+    async with _hash_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_pool, func, *args)
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64URL 编码（无填充）"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _token_signing_state(user_id: uuid.UUID, token_type: str) -> tuple[bytes, hmac.HMAC]:
+    """
+    获取指定用户和 Token 类型的签名前缀及对应的 HMAC 状态
+    
+    Payload 按 {"sub":...,"type":...,"exp":<exp>} 排列，exp 之前的部分固定不变。
+    在 "{" 后补空格使前缀长度为 3 的倍数，前缀的 Base64 编码即可与 exp 部分的编码直接拼接
+    
+    Args:
+        user_id: 用户 ID
+        token_type: Token 类型
+    
+    Returns:
+        (签名前缀, 已输入签名前缀的 HMAC 对象)，HMAC 对象需 copy 后使用
+    """
+    cache_key = (user_id, token_type)
+    with _token_signing_cache_lock:
+        cached = _token_signing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    prefix = (
+        b'{"sub":' + orjson.dumps(str(user_id))
+        + b',"type":' + orjson.dumps(token_type)
+        + b',"exp":'
+    )
+    prefix = b"{" + b" " * (-len(prefix) % 3) + prefix[1:]
+    signing_prefix = _HS256_HEADER_B64 + b"." + _b64url(prefix)
+    state = (signing_prefix, hmac.new(SECRET, signing_prefix, hashlib.sha256))
+    with _token_signing_cache_lock:
+        _token_signing_cache[cache_key] = state
+    return state
+
+
+def _encode_token(user_id: uuid.UUID, token_type: str, expire: datetime) -> str:
+    """
+    签发 JWT
+    HS256 时直接拼接缓存的签名前缀，只对 exp 部分做 Base64 和 HMAC 计算；
+    其他算法交给 PyJWT
+    
+    Args:
+        user_id: 用户 ID
+        token_type: Token 类型
+        expire: 过期时间
+    
+    Returns:
+        JWT 字符串
+    """
+    if settings.algorithm != "HS256":
+        payload = {
+            "sub": str(user_id),
+            "exp": expire,
+            "type": token_type
+        }
+        return jwt.encode(payload, SECRET, algorithm=settings.algorithm)
+    
+    signing_prefix, base_mac = _token_signing_state(user_id, token_type)
+    suffix = _b64url(b"%d}" % int(expire.timestamp()))
+    mac = base_mac.copy()
+    mac.update(suffix)
+    return b"".join(
+        (signing_prefix, suffix, b".", _b64url(mac.digest()))
+    ).decode("ascii")
 
 
 class AuthServiceError(Exception):
@@ -47,31 +238,20 @@ class AuthService:
         self.user_repo = UserRepository(db)
     
     @staticmethod
-    def hash_password(password: str) -> str:
-        """
-        对密码进行哈希处理
-        
-        Args:
-            password: 明文密码
-        
-        Returns:
-            密码哈希值
-        """
-        return pwd_context.hash(password)
-    
-    @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
+    def password_needs_rehash(hashed_password: str) -> bool:
         """
-        验证密码是否正确
+        检查密码哈希是否需要重新计算
+        旧版 bcrypt 哈希或参数过时的 Argon2 哈希均需要迁移
         
         Args:
-            plain_password: 明文密码
             hashed_password: 密码哈希
         
         Returns:
-            True 表示密码正确
+            True 表示需要重新哈希
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        if hashed_password.startswith(_BCRYPT_PREFIXES):
+            return True
+        return password_hasher.check_needs_rehash(hashed_password)
     
     @staticmethod
     def create_access_token(user_id: uuid.UUID) -> str:
@@ -87,12 +267,7 @@ class AuthService:
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=settings.access_token_expire_minutes
         )
-        payload = {
-            "sub": str(user_id),
-            "exp": expire,
-            "type": "access"
-        }
-        return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+        return _encode_token(user_id, "access", expire)
     
     @staticmethod
     def create_refresh_token(user_id: uuid.UUID) -> str:
@@ -108,12 +283,25 @@ class AuthService:
         expire = datetime.now(timezone.utc) + timedelta(
             days=settings.refresh_token_expire_days
         )
-        payload = {
-            "sub": str(user_id),
-            "exp": expire,
-            "type": "refresh"
-        }
-        return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+        return _encode_token(user_id, "refresh", expire)
+    
+    @classmethod
+    def issue_tokens(cls, user_id: uuid.UUID) -> TokenResponse:
+        """
+        签发访问令牌和刷新令牌
+        HS256 签名只需十几微秒，直接在当前线程计算；
+        分派到线程池或进程池的调度开销远大于签名本身
+        
+        Args:
+            user_id: 用户 ID
+        
+        Returns:
+            Token 响应
+        """
+        return TokenResponse(
+            access_token=cls.create_access_token(user_id),
+            refresh_token=cls.create_refresh_token(user_id)
+        )
     
     @staticmethod
     def decode_token(token: str) -> dict:
@@ -129,15 +317,30 @@ class AuthService:
         Raises:
             InvalidTokenError: Token 无效或已过期
         """
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        
+        with _token_cache_lock:
+            cached = _token_cache.get(cache_key)
+        if cached is not None:
+            payload, exp_ts = cached
+            if now < exp_ts:
+                return dict(payload)
+        
         try:
             payload = jwt.decode(
                 token,
-                settings.secret_key,
+                SECRET,
                 algorithms=[settings.algorithm]
             )
-            return payload
         except JWTError as e:
             raise InvalidTokenError(f"Token 无效: {str(e)}")
+        
+        exp_ts = payload.get("exp")
+        if isinstance(exp_ts, (int, float)) and exp_ts - now >= _TOKEN_CACHE_MIN_REMAINING:
+            with _token_cache_lock:
+                _token_cache[cache_key] = (dict(payload), exp_ts)
+        return payload
     
     async def register(self, data: UserRegisterRequest) -> User:
         """
@@ -152,17 +355,17 @@ class AuthService:
         Raises:
             EmailAlreadyExistsError: 邮箱已被注册
         """
-        # 检查邮箱是否已存在
-        if await self.user_repo.email_exists(data.email):
-            raise EmailAlreadyExistsError("该邮箱已被注册")
+        # 哈希计算放到进程池，避免阻塞事件循环
+        password_hash = await run_hash_job(_hash_password, data.password)
         
-        # 创建用户
-        password_hash = self.hash_password(data.password)
-        user = await self.user_repo.create(
+        # 创建用户，邮箱已存在时数据库不会插入
+        user = await self.user_repo.create_if_absent(
             email=data.email,
             password_hash=password_hash,
             username=data.username
         )
+        if user is None:
+            raise EmailAlreadyExistsError("该邮箱已被注册")
         
         return user
     
@@ -180,27 +383,27 @@ class AuthService:
         Raises:
             InvalidCredentialsError: 邮箱或密码错误
         """
-        # 查找用户
-        user = await self.user_repo.get_by_email(email)
-        if not user:
-            raise InvalidCredentialsError("邮箱或密码错误")
+        # 查找用户（只查询登录校验所需的字段）
+        row = await self.user_repo.get_auth_row(email)
         
-        # 验证密码
-        if not self.verify_password(password, user.password_hash):
+        # 验证密码（用户不存在时同样对占位哈希做一次校验）
+        password_hash = row.password_hash if row else _DUMMY_HASH
+        password_ok = await run_hash_job(_verify_password, password, password_hash)
+        if not row or not password_ok:
             raise InvalidCredentialsError("邮箱或密码错误")
+        user_id, password_hash, is_active = row
         
         # 检查账户状态
-        if not user.is_active:
+        if not is_active:
             raise InvalidCredentialsError("账户已被禁用")
         
-        # 生成 Token
-        access_token = self.create_access_token(user.id)
-        refresh_token = self.create_refresh_token(user.id)
+        # 惰性迁移旧哈希
+        if self.password_needs_rehash(password_hash):
+            new_hash = await run_hash_job(_hash_password, password)
+            await self.user_repo.update_password_hash(user_id, new_hash)
         
-        return TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token
-        )
+        # 生成 Token
+        return self.issue_tokens(user_id)
     
     async def refresh_tokens(self, refresh_token: str) -> TokenResponse:
         """
@@ -222,21 +425,15 @@ class AuthService:
         if payload.get("type") != "refresh":
             raise InvalidTokenError("无效的刷新令牌")
         
-        # 获取用户
+        # 获取用户状态（无需加载完整用户资料）
         user_id = uuid.UUID(payload.get("sub"))
-        user = await self.user_repo.get_by_id(user_id)
+        row = await self.user_repo.get_status_row(user_id)
         
-        if not user or not user.is_active:
+        if not row or not row.is_active:
             raise InvalidTokenError("用户不存在或已被禁用")
         
         # 生成新 Token
-        new_access_token = self.create_access_token(user.id)
-        new_refresh_token = self.create_refresh_token(user.id)
-        
-        return TokenResponse(
-            access_token=new_access_token,
-            refresh_token=new_refresh_token
-        )
+        return self.issue_tokens(user_id)
     
     async def get_current_user(self, token: str) -> User:
         """
@@ -0,0 +1,30 @@
+"""
+认证服务单元测试
+"""
+import bcrypt
+import pytest
+
+from app.service.auth_service import _hash_password, _verify_password
+
+
+@pytest.mark.parametrize(
+    "hashed_password",
+    ["$2b$12$garbage", "$2a$", "$2b$", "$2y$", "$2b$12$"],
+)
+def test_verify_password_rejects_malformed_bcrypt_hash(hashed_password):
+    """格式错误的旧版 bcrypt 哈希视为校验失败，而不是抛出异常"""
+    assert _verify_password("Passw0rd!", hashed_password) is False
+
+
+def test_verify_password_accepts_valid_bcrypt_hash():
+    """合法的旧版 bcrypt 哈希仍可正常校验"""
+    hashed_password = bcrypt.hashpw(b"Passw0rd!", bcrypt.gensalt(rounds=4)).decode("utf-8")
+    assert _verify_password("Passw0rd!", hashed_password) is True
+    assert _verify_password("wrong-password", hashed_password) is False
+
+
+def test_verify_password_argon2_roundtrip():
+    """Argon2id 哈希可正常校验"""
+    hashed_password = _hash_password("Passw0rd!")
+    assert _verify_password("Passw0rd!", hashed_password) is True
+    assert _verify_password("wrong-password", hashed_password) is False
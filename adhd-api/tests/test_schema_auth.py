@@ -0,0 +1,20 @@
+"""
+认证请求模型单元测试
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.schema.auth import UserLoginRequest, UserRegisterRequest
+
+
+def test_login_email_strips_whitespace_like_register():
+    """登录与注册对首尾空白的处理一致"""
+    login = UserLoginRequest(email=" foo@Example.com ", password="x")
+    register = UserRegisterRequest(email=" foo@Example.com ", password="Passw0rd!")
+    assert login.email == register.email == "foo@example.com"
+
+
+def test_login_email_rejects_invalid_format():
+    """格式不正确的邮箱返回校验错误"""
+    with pytest.raises(ValidationError):
+        UserLoginRequest(email="not-an-email", password="x")
@@ -0,0 +1,52 @@
+"""
+用户仓储单元测试
+"""
+import asyncio
+import uuid
+
+from app.model.user import User
+from app.repository import user_repository
+from app.repository.user_repository import UserRepository, _invalidate_user_cache
+
+
+class _FakeResult:
+    def __init__(self, user):
+        self._user = user
+
+    def scalar_one_or_none(self):
+        return self._user
+
+
+class _SlowSession:
+    """在查询返回前执行给定回调，模拟查询期间发生的并发更新"""
+
+    def __init__(self, user, during_query):
+        self._user = user
+        self._during_query = during_query
+
+    async def execute(self, stmt):
+        self._during_query()
+        return _FakeResult(self._user)
+
+
+def test_get_by_id_does_not_cache_row_invalidated_during_query():
+    """查询期间用户被更新时，旧数据不会写回缓存"""
+    user_id = uuid.uuid4()
+    stale = User(id=user_id, email="a@example.com", password_hash="x", username="old", is_active=True)
+    repo = UserRepository(_SlowSession(stale, lambda: _invalidate_user_cache(user_id)))
+
+    result = asyncio.run(repo.get_by_id(user_id))
+
+    assert result is stale
+    assert user_id not in user_repository._user_cache
+
+
+def test_get_by_id_caches_row_without_concurrent_update():
+    """无并发更新时查询结果写入缓存"""
+    user_id = uuid.uuid4()
+    user = User(id=user_id, email="b@example.com", password_hash="x", username="name", is_active=True)
+    repo = UserRepository(_SlowSession(user, lambda: None))
+
+    asyncio.run(repo.get_by_id(user_id))
+
+    assert user_repository._user_cache[user_id].username == "name"